@@ -18,12 +18,17 @@ SDK Implementation Notes (2025):
 - Supports parallel tool execution (via tool_choice.disable_parallel_tool_use)
 - Error handling via "is_error" flag in tool results
 - Multi-turn conversation with proper message history management
+- Prompt caching via "cache_control" breakpoints on tools and messages
+- Streaming responses via messages.stream (Server-Sent Events in main.py)
 """
 
 import os
-import json
-from typing import Dict, Any, List, Optional
-from anthropic import Anthropic
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional
+import orjson
+from anthropic import AsyncAnthropic
+from cachetools import TTLCache
 import database as db
 
 
@@ -137,14 +142,132 @@ TOOLS = [
 ]
 
 
+# Prompt caching: a breakpoint on the last tool caches the whole tool list as a
+# stable prefix shared by every request. TOOLS itself stays unannotated.
+#
+# The payload is built once as an immutable tuple shared by all concurrent
+# requests. The full list is sent on every turn, including tool-result turns:
+# tools head the cached prefix, so pruning them would invalidate the cache,
+# and Claude may still need tools it has not used yet (e.g. get_user, then
+# cancel_order).
+CACHE_CONTROL = {"type": "ephemeral"}
+
+_CACHED_TOOLS = tuple(TOOLS[:-1]) + ({**TOOLS[-1], "cache_control": CACHE_CONTROL},)
+
+
 # ============================================================================
 # Tool Execution Logic
 # ============================================================================
 
+def _do_get_user(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Search customer by key/value."""
+    customer = db.search_customer(tool_input["key"], tool_input["value"])
+    if customer:
+        return {"success": True, "customer": customer}
+    else:
+        return {"success": False, "message": f"No customer found with {tool_input['key']}={tool_input['value']}"}
+
+
+def _do_get_order_by_id(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Get order by ID."""
+    order = db.get_order(tool_input["order_id"])
+    if order:
+        return {"success": True, "order": order}
+    else:
+        return {"success": False, "message": f"Order {tool_input['order_id']} not found"}
+
+
+def _do_get_customer_orders(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Get all orders for a customer."""
+    orders = db.get_customer_orders(tool_input["customer_id"])
+    return {"success": True, "orders": orders, "count": len(orders)}
+
+
+def _do_cancel_order(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Cancel an order (only if Processing)."""
+    return db.cancel_order(tool_input["order_id"])
+
+
+def _do_update_user_contact(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Update customer contact info."""
+    customer_id = tool_input["customer_id"]
+    email = tool_input.get("email")
+    phone = tool_input.get("phone")
+
+    if not email and not phone:
+        return {"success": False, "message": "Must provide at least email or phone to update"}
+
+    success = db.update_customer(customer_id, email=email, phone=phone)
+
+    if success:
+        return {"success": True, "message": f"Updated contact info for customer {customer_id}"}
+    else:
+        return {"success": False, "message": f"Customer {customer_id} not found"}
+
+
+def _do_get_user_info(tool_input: Dict[str, Any]) -> Dict[str, Any]:
+    """Get customer + orders combined."""
+    key = tool_input["key"]
+    value = tool_input["value"]
+
+    # Fetch the customer and their orders in one query
+    result = db.get_customer_with_orders_joined(key, value)
+
+    if not result:
+        return {"success": False, "message": f"No customer found with {key}={value}"}
+
+    return {
+        "success": True,
+        "customer": result["customer"],
+        "orders": result["orders"],
+        "order_count": len(result["orders"])
+    }
+
+
+# Tool name -> handler; dispatch is a single dict lookup
+_DISPATCH: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "get_user": _do_get_user,
+    "get_order_by_id": _do_get_order_by_id,
+    "get_customer_orders": _do_get_customer_orders,
+    "cancel_order": _do_cancel_order,
+    "update_user_contact": _do_update_user_contact,
+    "get_user_info": _do_get_user_info,
+}
+
+# Idempotent reads whose results may be served from the cache
+READ_ONLY_TOOLS = frozenset({"get_user", "get_order_by_id", "get_customer_orders", "get_user_info"})
+
+# Short-lived cache of read-only tool results, keyed on (tool_name, input).
+# Claude often re-fetches the same customer/orders within one conversation.
+_READ_CACHE: TTLCache = TTLCache(maxsize=2048, ttl=30)
+_READ_CACHE_LOCK = threading.Lock()
+# Bumped on every invalidation. A read only stores its result if no write
+# invalidated the cache while its handler was running, so a read racing a
+# write (tools in one turn run concurrently) can't cache pre-write data.
+_cache_generation = 0
+
+
+def invalidate_read_cache() -> None:
+    """
+    Drop all cached read-only tool results.
+
+    Called after any write: a changed email, phone or order status can
+    affect cached lookups keyed by other fields, so the cache is cleared
+    wholesale rather than by id.
+    """
+    global _cache_generation
+    with _READ_CACHE_LOCK:
+        _cache_generation += 1
+        _READ_CACHE.clear()
+
+
 def execute_tool(tool_name: str, tool_input: Dict[str, Any]) -> Dict[str, Any]:
     """
     Execute a tool and return the result.
 
+    Read-only tools are memoized for a few seconds; write tools invalidate
+    the memoized results.
+
     Args:
         tool_name: Name of the tool to execute
         tool_input: Tool parameters as a dict
@@ -155,81 +278,211 @@ def execute_tool(tool_name: str, tool_input: Dict[str, Any]) -> Dict[str, Any]:
     Raises:
         ValueError: If tool_name is not recognized
     """
-    if tool_name == "get_user":
-        # Search customer by key/value
-        customer = db.search_customer(tool_input["key"], tool_input["value"])
-        if customer:
-            return {"success": True, "customer": customer}
-        else:
-            return {"success": False, "message": f"No customer found with {tool_input['key']}={tool_input['value']}"}
-
-    elif tool_name == "get_order_by_id":
-        # Get order by ID
-        order = db.get_order(tool_input["order_id"])
-        if order:
-            return {"success": True, "order": order}
-        else:
-            return {"success": False, "message": f"Order {tool_input['order_id']} not found"}
-
-    elif tool_name == "get_customer_orders":
-        # Get all orders for a customer
-        orders = db.get_customer_orders(tool_input["customer_id"])
-        return {"success": True, "orders": orders, "count": len(orders)}
-
-    elif tool_name == "cancel_order":
-        # Cancel an order (only if Processing)
-        result = db.cancel_order(tool_input["order_id"])
+    try:
+        handler = _DISPATCH[tool_name]
+    except KeyError:
+        raise ValueError(f"Unknown tool: {tool_name}") from None
+
+    if tool_name not in READ_ONLY_TOOLS:
+        try:
+            return handler(tool_input)
+        finally:
+            invalidate_read_cache()
+
+    key = (tool_name, tuple(sorted(tool_input.items())))
+    with _READ_CACHE_LOCK:
+        result = _READ_CACHE.get(key)
+        generation = _cache_generation
+    if result is not None:
         return result
 
-    elif tool_name == "update_user_contact":
-        # Update customer contact info
-        customer_id = tool_input["customer_id"]
-        email = tool_input.get("email")
-        phone = tool_input.get("phone")
+    result = handler(tool_input)
+    with _READ_CACHE_LOCK:
+        if generation == _cache_generation:
+            _READ_CACHE[key] = result
+    return result
 
-        if not email and not phone:
-            return {"success": False, "message": "Must provide at least email or phone to update"}
 
-        success = db.update_customer(customer_id, email=email, phone=phone)
+def _run_tool(tool_use: Any) -> Dict[str, Any]:
+    """
+    Execute a single tool_use block and format it as a tool_result block.
 
-        if success:
-            return {"success": True, "message": f"Updated contact info for customer {customer_id}"}
-        else:
-            return {"success": False, "message": f"Customer {customer_id} not found"}
+    Exceptions are captured so one failing tool never aborts the batch;
+    they are reported back to Claude with the "is_error" flag instead.
 
-    elif tool_name == "get_user_info":
-        # Get customer + orders combined
-        key = tool_input["key"]
-        value = tool_input["value"]
+    Args:
+        tool_use: tool_use content block from Claude's response
 
-        # First find the customer
-        if key == "customer_id":
-            customer = db.get_customer(value)
-        else:
-            customer = db.search_customer(key, value)
+    Returns:
+        tool_result block ready to send back to Claude
+    """
+    try:
+        result = execute_tool(tool_use.name, tool_use.input)
+        is_error = False
+    except Exception as e:
+        result = {"error": str(e)}
+        is_error = True
+
+    # Format tool result for Claude (2025 SDK pattern)
+    # Note: Simple string content is valid; wrapping in [{"type": "text"}] is optional
+    tool_result = {
+        "type": "tool_result",
+        "tool_use_id": tool_use.id,
+        "content": orjson.dumps(result).decode()
+    }
 
-        if not customer:
-            return {"success": False, "message": f"No customer found with {key}={value}"}
+    # Add error flag if tool execution failed (2025 SDK enhancement)
+    if is_error or (isinstance(result, dict) and "error" in result):
+        tool_result["is_error"] = True
 
-        # Get their orders
-        orders = db.get_customer_orders(customer["id"])
+    return tool_result
 
-        return {
-            "success": True,
-            "customer": customer,
-            "orders": orders,
-            "order_count": len(orders)
-        }
 
-    else:
-        raise ValueError(f"Unknown tool: {tool_name}")
+async def _run_tools(tool_use_blocks: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Execute a batch of tool_use blocks concurrently.
+
+    Each tool runs in a worker thread so database work never blocks the
+    event loop; turn latency becomes max(tool_time) instead of sum(tool_time).
+
+    Args:
+        tool_use_blocks: tool_use content blocks from one Claude response
+
+    Returns:
+        tool_result blocks in the same order as tool_use_blocks
+    """
+    return list(await asyncio.gather(
+        *[asyncio.to_thread(_run_tool, tool_use) for tool_use in tool_use_blocks]
+    ))
 
 
 # ============================================================================
 # Claude API Integration
 # ============================================================================
 
-def chat_with_claude(message: str, conversation_history: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+# Read once at import (main.py loads .env before importing this module)
+_API_KEY = os.environ.get("ANTHROPIC_API_KEY")
+
+# Shared async client: reusing one instance keeps the HTTP connection pool to
+# api.anthropic.com alive across requests and tool-result roundtrips, and
+# lets one event loop multiplex many in-flight Claude calls.
+_ASYNC_CLIENT: Optional[AsyncAnthropic] = None
+
+
+def _get_client() -> AsyncAnthropic:
+    """
+    Return the shared AsyncAnthropic client, creating it on first use.
+
+    Returns:
+        AsyncAnthropic client configured from ANTHROPIC_API_KEY
+
+    Raises:
+        RuntimeError: If ANTHROPIC_API_KEY was not set
+    """
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        if not _API_KEY:
+            raise RuntimeError(MISSING_API_KEY_MESSAGE)
+        _ASYNC_CLIENT = AsyncAnthropic(api_key=_API_KEY)
+    return _ASYNC_CLIENT
+
+
+# Arguments shared by every messages.create / messages.stream call
+_REQUEST_DEFAULTS: Dict[str, Any] = {
+    "model": "claude-haiku-4-5-20251001",  # Claude 4.5 Haiku (latest)
+    "max_tokens": 1024,
+    "tools": _CACHED_TOOLS,
+    "tool_choice": {
+        "type": "auto",  # Claude decides which tools to use
+        "disable_parallel_tool_use": False,  # False = parallel enabled (default)
+    },
+    # Other tool_choice options:
+    # {"type": "any"}  # Force Claude to use at least one tool
+    # {"type": "tool", "name": "get_user"}  # Force specific tool
+    # {"type": "none"}  # Prevent tool use
+}
+
+
+MISSING_API_KEY_MESSAGE = (
+    "Error: ANTHROPIC_API_KEY not found in environment variables. "
+    "Please add your API key to the .env file."
+)
+
+
+def _start_messages(message: str, conversation_history: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Build the message list for a new user turn.
+
+    The cache breakpoint on the new user message caches the prior history plus
+    this message, so every tool-result roundtrip only processes new tokens.
+
+    Args:
+        message: User's message
+        conversation_history: Optional list of previous messages
+
+    Returns:
+        Messages to send to Claude
+    """
+    if conversation_history is None:
+        conversation_history = []
+
+    return conversation_history + [{
+        "role": "user",
+        "content": [{"type": "text", "text": message, "cache_control": CACHE_CONTROL}]
+    }]
+
+
+async def _add_tool_roundtrip(response: Any, messages: List[Dict[str, Any]],
+                              tool_calls_log: List[Dict[str, Any]]) -> bool:
+    """
+    Execute the tools Claude requested and append the roundtrip to the messages.
+
+    Args:
+        response: Claude response with stop_reason == "tool_use"
+        messages: Messages sent to Claude so far, extended in place
+        tool_calls_log: Log of tool calls, extended in place
+
+    Returns:
+        False if the response contained no tool_use blocks (nothing appended)
+    """
+    # Extract tool use blocks
+    tool_use_blocks = [block for block in response.content if block.type == "tool_use"]
+
+    # stop_reason "tool_use" without any tool_use blocks: there is nothing to
+    # answer, and sending an empty roundtrip would just waste an API call
+    if not tool_use_blocks:
+        return False
+
+    # Log the tool calls in the order Claude requested them
+    for tool_use in tool_use_blocks:
+        tool_calls_log.append({
+            "tool": tool_use.name,
+            "input": tool_use.input
+        })
+
+    # Execute all requested tools concurrently
+    tool_results = await _run_tools(tool_use_blocks)
+
+    # Move the cache breakpoint to the newest tool_result so the next roundtrip
+    # reuses everything up to and including this turn (Anthropic allows at
+    # most 4 breakpoints). The user's own message keeps its breakpoint.
+    previous_block = messages[-1]["content"][-1]
+    if previous_block.get("type") == "tool_result":
+        del previous_block["cache_control"]
+    tool_results[-1]["cache_control"] = CACHE_CONTROL
+
+    # Append in place (no list copy per roundtrip). The assistant turn is
+    # converted from SDK block objects to plain dicts once, here.
+    messages.append({
+        "role": "assistant",
+        "content": [block.to_dict(exclude_none=True) for block in response.content]
+    })
+    messages.append({"role": "user", "content": tool_results})
+
+    return True
+
+
+async def chat_with_claude(message: str, conversation_history: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """
     Send a message to Claude with tool calling enabled (2025 SDK Pattern).
 
@@ -247,6 +500,7 @@ def chat_with_claude(message: str, conversation_history: Optional[List[Dict[str,
         Dict with:
             - response: Claude's text response
             - tool_calls: List of tools used (for transparency/debugging)
+            - cache_read_input_tokens: Prompt tokens served from Claude's cache
 
     Educational note: This demonstrates the full Claude function calling workflow
     using November 2025 SDK patterns:
@@ -255,100 +509,38 @@ def chat_with_claude(message: str, conversation_history: Optional[List[Dict[str,
     - Support for parallel tool execution
     - Simple string content format (no wrapping required)
     """
-    # Initialize Anthropic client
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
+    # Check the API key before touching the client
+    if not _API_KEY:
         return {
-            "response": "Error: ANTHROPIC_API_KEY not found in environment variables. "
-                       "Please add your API key to the .env file.",
+            "response": MISSING_API_KEY_MESSAGE,
             "tool_calls": []
         }
 
-    client = Anthropic(api_key=api_key)
+    client = _get_client()
 
     # Build conversation messages
-    if conversation_history is None:
-        conversation_history = []
-
-    # Add user message
-    messages = conversation_history + [{"role": "user", "content": message}]
+    messages = _start_messages(message, conversation_history)
 
     # Track tool calls for transparency
     tool_calls_log = []
+    cache_read_input_tokens = 0
 
     try:
         # Step 1: Send message to Claude with tools
         # Note: Claude 2025 supports parallel tool execution by default
-        response = client.messages.create(
-            model="claude-haiku-4-5-20251001",  # Claude 4.5 Haiku (latest)
-            max_tokens=1024,
-            tools=TOOLS,
-            messages=messages,
-            tool_choice={
-                "type": "auto",  # Claude decides which tools to use
-                "disable_parallel_tool_use": False,  # False = parallel enabled (default)
-            },
-            # Other tool_choice options:
-            # {"type": "any"}  # Force Claude to use at least one tool
-            # {"type": "tool", "name": "get_user"}  # Force specific tool
-            # {"type": "none"}  # Prevent tool use
-        )
+        response = await client.messages.create(messages=messages, **_REQUEST_DEFAULTS)
+
+        cache_read_input_tokens += response.usage.cache_read_input_tokens or 0
 
         # Step 2: Check if Claude wants to use tools
         while response.stop_reason == "tool_use":
-            # Extract tool use blocks
-            tool_use_blocks = [block for block in response.content if block.type == "tool_use"]
-
-            # Execute each tool
-            tool_results = []
-            for tool_use in tool_use_blocks:
-                tool_name = tool_use.name
-                tool_input = tool_use.input
-
-                # Log the tool call
-                tool_calls_log.append({
-                    "tool": tool_name,
-                    "input": tool_input
-                })
-
-                # Execute the tool
-                try:
-                    result = execute_tool(tool_name, tool_input)
-                    is_error = False
-                except Exception as e:
-                    result = {"error": str(e)}
-                    is_error = True
-
-                # Format tool result for Claude (2025 SDK pattern)
-                # Note: Simple string content is valid; wrapping in [{"type": "text"}] is optional
-                tool_result = {
-                    "type": "tool_result",
-                    "tool_use_id": tool_use.id,
-                    "content": json.dumps(result)
-                }
-
-                # Add error flag if tool execution failed (2025 SDK enhancement)
-                if is_error or (isinstance(result, dict) and "error" in result):
-                    tool_result["is_error"] = True
-
-                tool_results.append(tool_result)
+            # Execute the tools and add their results to the conversation
+            if not await _add_tool_roundtrip(response, messages, tool_calls_log):
+                break
 
             # Step 3: Send tool results back to Claude
-            messages = messages + [
-                {"role": "assistant", "content": response.content},
-                {"role": "user", "content": tool_results}
-            ]
-
-            response = client.messages.create(
-                model="claude-haiku-4-5-20251001",  # Claude 4.5 Haiku
-                max_tokens=1024,
-                tools=TOOLS,
-                messages=messages,
-                tool_choice={
-                    "type": "auto",
-                    "disable_parallel_tool_use": False,
-                },
-            )
+            response = await client.messages.create(messages=messages, **_REQUEST_DEFAULTS)
+            cache_read_input_tokens += response.usage.cache_read_input_tokens or 0
 
         # Step 4: Extract final text response
         text_response = ""
@@ -358,7 +550,8 @@ def chat_with_claude(message: str, conversation_history: Optional[List[Dict[str,
 
         return {
             "response": text_response,
-            "tool_calls": tool_calls_log
+            "tool_calls": tool_calls_log,
+            "cache_read_input_tokens": cache_read_input_tokens
         }
 
     except Exception as e:
@@ -368,11 +561,75 @@ def chat_with_claude(message: str, conversation_history: Optional[List[Dict[str,
         }
 
 
+async def stream_chat_with_claude(message: str,
+                                  conversation_history: Optional[List[Dict[str, Any]]] = None
+                                  ) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream Claude's reply as it is generated, running tools between turns.
+
+    Same conversation flow as chat_with_claude, but text is yielded as soon
+    as Claude produces it instead of after the final turn completes.
+
+    Args:
+        message: User's message
+        conversation_history: Optional list of previous messages
+
+    Yields:
+        Event dicts, one of:
+            - {"type": "delta", "text": ...}: next chunk of response text
+            - {"type": "done", "tool_calls": [...], "cache_read_input_tokens": ...}
+            - {"type": "error", "message": ...}: stream ended early
+    """
+    if not _API_KEY:
+        yield {"type": "error", "message": MISSING_API_KEY_MESSAGE}
+        return
+
+    client = _get_client()
+    messages = _start_messages(message, conversation_history)
+
+    tool_calls_log = []
+    cache_read_input_tokens = 0
+
+    # Separates text streamed before a tool roundtrip from the text after it
+    separator = ""
+
+    try:
+        while True:
+            streamed_text = False
+            async with client.messages.stream(messages=messages, **_REQUEST_DEFAULTS) as stream:
+                async for text in stream.text_stream:
+                    yield {"type": "delta", "text": separator + text}
+                    separator = ""
+                    streamed_text = True
+                response = await stream.get_final_message()
+
+            cache_read_input_tokens += response.usage.cache_read_input_tokens or 0
+
+            if response.stop_reason != "tool_use":
+                break
+
+            if streamed_text:
+                separator = "\n\n"
+
+            # Execute the tools, then open a new stream for the tool-result turn
+            if not await _add_tool_roundtrip(response, messages, tool_calls_log):
+                break
+
+        yield {
+            "type": "done",
+            "tool_calls": tool_calls_log,
+            "cache_read_input_tokens": cache_read_input_tokens
+        }
+
+    except Exception as e:
+        yield {"type": "error", "message": f"Error communicating with Claude AI: {str(e)}"}
+
+
 # ============================================================================
 # Convenience Function for Stateless Chat
 # ============================================================================
 
-def process_chat_message(message: str) -> Dict[str, Any]:
+async def process_chat_message(message: str) -> Dict[str, Any]:
     """
     Process a single chat message (stateless).
 
@@ -385,4 +642,17 @@ def process_chat_message(message: str) -> Dict[str, Any]:
     Returns:
         Dict with response and tool_calls
     """
-    return chat_with_claude(message, conversation_history=None)
+    return await chat_with_claude(message, conversation_history=None)
+
+
+def stream_chat_message(message: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream the reply to a single chat message (stateless).
+
+    Args:
+        message: User's message
+
+    Returns:
+        Async iterator of stream events (see stream_chat_with_claude)
+    """
+    return stream_chat_with_claude(message, conversation_history=None)
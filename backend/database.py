@@ -2,15 +2,31 @@
 Database module for Blackbird Customer Support Application.
 
 Provides SQLite schema creation, connection management, and CRUD operations.
+
+Thread safety:
+    Each thread (the event loop and every threadpool worker running a sync
+    endpoint or AI tool) gets its own persistent connection via
+    threading.local, so a connection is never shared across threads
+    (sqlite3's default check_same_thread guard enforces this). WAL mode lets
+    those connections read concurrently while one of them writes; a writer
+    that finds the database locked waits up to busy_timeout instead of
+    failing immediately.
 """
 
+import logging
 import sqlite3
+import threading
 from contextlib import contextmanager
 from typing import Optional, List, Dict, Any
 
+logger = logging.getLogger(__name__)
+
 # Database file path
 DATABASE_PATH = "blackbird.db"
 
+# Rows fetched per round trip by bulk reads
+FETCH_SIZE = 1000
+
 # SQL Schema Definitions
 SCHEMA_SQL = """
 -- Enable foreign key constraints
@@ -44,10 +60,39 @@ CREATE TABLE IF NOT EXISTS orders (
 -- Indexes for search performance
 CREATE INDEX IF NOT EXISTS idx_customers_email ON customers(email);
 CREATE INDEX IF NOT EXISTS idx_customers_username ON customers(username);
+CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers(phone);
 CREATE INDEX IF NOT EXISTS idx_orders_customer_id ON orders(customer_id);
 CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
 """
 
+# Per-connection tuning applied once when a thread opens its connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",      # Readers don't block the writer
+    "PRAGMA synchronous = NORMAL",    # Safe with WAL, avoids fsync per commit
+    "PRAGMA cache_size = -64000",     # 64 MB page cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",     # Wait up to 5 s for a competing writer
+)
+
+# One connection per thread, reused across requests and tool calls
+_local = threading.local()
+
+# Customer columns, listed explicitly instead of SELECT *
+CUSTOMER_COLUMNS = "id, name, email, phone, username"
+
+# Precomputed statements for the finite set of search keys and update shapes,
+# so identical SQL text hits the connection's prepared-statement cache
+_SEARCH_SQL = {
+    key: f"SELECT {CUSTOMER_COLUMNS} FROM customers WHERE {key} = ?"
+    for key in ('email', 'phone', 'username')
+}
+
+_UPDATE_SQL = {
+    ('email',): "UPDATE customers SET email = ? WHERE id = ?",
+    ('phone',): "UPDATE customers SET phone = ? WHERE id = ?",
+    ('email', 'phone'): "UPDATE customers SET email = ?, phone = ? WHERE id = ?",
+}
+
 
 def init_database() -> None:
     """
@@ -55,17 +100,35 @@ def init_database() -> None:
 
     Creates tables and indexes if they don't exist.
     Safe to call multiple times (uses IF NOT EXISTS).
+
+    Runs on the calling thread's persistent connection, so startup also
+    pre-warms that connection and switches the file to WAL before the first
+    request arrives.
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
+    conn = _get_connection()
 
     # Execute schema SQL (multiple statements)
-    cursor.executescript(SCHEMA_SQL)
-
+    conn.executescript(SCHEMA_SQL)
     conn.commit()
-    conn.close()
 
-    print(f"✓ Database schema initialized: {DATABASE_PATH}")
+    logger.info("✓ Database schema initialized: %s", DATABASE_PATH)
+
+
+def _get_connection() -> sqlite3.Connection:
+    """
+    Get this thread's database connection, opening it on first use.
+
+    Returns:
+        sqlite3.Connection with row_factory set to Row and PRAGMAs applied
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DATABASE_PATH, cached_statements=128)
+        conn.row_factory = sqlite3.Row  # Access columns by name
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
+    return conn
 
 
 @contextmanager
@@ -84,18 +147,43 @@ def get_db():
 
     Note:
         Automatically commits on success and rolls back on error.
-        Connection is closed when context exits.
+        The connection stays open and is reused by later calls on the
+        same thread, so it must not be closed by callers.
     """
-    conn = sqlite3.connect(DATABASE_PATH)
-    conn.row_factory = sqlite3.Row  # Access columns by name
+    conn = _get_connection()
     try:
         yield conn
         conn.commit()
     except Exception:
         conn.rollback()
         raise
-    finally:
-        conn.close()
+
+
+def _bulk_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """
+    Create a cursor that returns plain tuples for bulk reads.
+
+    Skips building a sqlite3.Row per row; pair with _rows_to_dicts.
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor
+
+
+def _rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """
+    Fetch all rows from a tuple cursor as dicts.
+
+    Column names are read from cursor.description once and zipped with each
+    row, so the per-row work stays in C.
+    """
+    columns = tuple(col[0] for col in cursor.description)
+    result = []
+    # Pull rows in chunks so the driver never holds a second full copy of
+    # the result set alongside the dicts
+    while rows := cursor.fetchmany(FETCH_SIZE):
+        result.extend(dict(zip(columns, row)) for row in rows)
+    return result
 
 
 # ============================================================================
@@ -115,7 +203,7 @@ def get_customer(customer_id: str) -> Optional[Dict[str, Any]]:
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute(
-            "SELECT * FROM customers WHERE id = ?",
+            f"SELECT {CUSTOMER_COLUMNS} FROM customers WHERE id = ?",
             (customer_id,)
         )
         row = cursor.fetchone()
@@ -136,13 +224,12 @@ def search_customer(key: str, value: str) -> Optional[Dict[str, Any]]:
     Raises:
         ValueError: If key is not a valid search field
     """
-    valid_keys = ['email', 'phone', 'username']
-    if key not in valid_keys:
-        raise ValueError(f"Invalid search key: {key}. Must be one of {valid_keys}")
+    query = _SEARCH_SQL.get(key)
+    if query is None:
+        raise ValueError(f"Invalid search key: {key}. Must be one of {list(_SEARCH_SQL)}")
 
     with get_db() as conn:
         cursor = conn.cursor()
-        query = f"SELECT * FROM customers WHERE {key} = ?"
         cursor.execute(query, (value,))
         row = cursor.fetchone()
         return dict(row) if row else None
@@ -156,10 +243,9 @@ def get_all_customers() -> List[Dict[str, Any]]:
         List of customer dicts
     """
     with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM customers ORDER BY name")
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        cursor = _bulk_cursor(conn)
+        cursor.execute(f"SELECT {CUSTOMER_COLUMNS} FROM customers ORDER BY name")
+        return _rows_to_dicts(cursor)
 
 
 def update_customer(customer_id: str, email: Optional[str] = None,
@@ -181,23 +267,22 @@ def update_customer(customer_id: str, email: Optional[str] = None,
     if email is None and phone is None:
         raise ValueError("Must provide at least one field to update")
 
-    updates = []
+    fields = []
     params = []
 
     if email is not None:
-        updates.append("email = ?")
+        fields.append('email')
         params.append(email)
 
     if phone is not None:
-        updates.append("phone = ?")
+        fields.append('phone')
         params.append(phone)
 
     params.append(customer_id)
 
     with get_db() as conn:
         cursor = conn.cursor()
-        query = f"UPDATE customers SET {', '.join(updates)} WHERE id = ?"
-        cursor.execute(query, tuple(params))
+        cursor.execute(_UPDATE_SQL[tuple(fields)], tuple(params))
         return cursor.rowcount > 0
 
 
@@ -236,13 +321,12 @@ def get_customer_orders(customer_id: str) -> List[Dict[str, Any]]:
         List of order dicts
     """
     with get_db() as conn:
-        cursor = conn.cursor()
+        cursor = _bulk_cursor(conn)
         cursor.execute(
             "SELECT * FROM orders WHERE customer_id = ? ORDER BY id",
             (customer_id,)
         )
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return _rows_to_dicts(cursor)
 
 
 def get_all_orders(status: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -257,7 +341,7 @@ def get_all_orders(status: Optional[str] = None) -> List[Dict[str, Any]]:
         List of order dicts
     """
     with get_db() as conn:
-        cursor = conn.cursor()
+        cursor = _bulk_cursor(conn)
 
         if status:
             cursor.execute(
@@ -267,8 +351,7 @@ def get_all_orders(status: Optional[str] = None) -> List[Dict[str, Any]]:
         else:
             cursor.execute("SELECT * FROM orders ORDER BY id")
 
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return _rows_to_dicts(cursor)
 
 
 def cancel_order(order_id: str) -> Dict[str, Any]:
@@ -282,31 +365,34 @@ def cancel_order(order_id: str) -> Dict[str, Any]:
         Dict with 'success' boolean and 'message' string
 
     Business rule: Orders can only be cancelled if status = 'Processing'
-    """
-    # Check current status
-    order = get_order(order_id)
 
-    if not order:
-        return {"success": False, "message": f"Order {order_id} not found"}
-
-    if order['status'] != 'Processing':
-        return {
-            "success": False,
-            "message": f"Cannot cancel order {order_id}. Status is '{order['status']}'. "
-                      "Only orders with status 'Processing' can be cancelled."
-        }
-
-    # Update status to Cancelled
+    The status check and the update are a single conditional UPDATE, so two
+    concurrent cancellations cannot both succeed.
+    """
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute(
-            "UPDATE orders SET status = 'Cancelled' WHERE id = ?",
+            "UPDATE orders SET status = 'Cancelled' WHERE id = ? AND status = 'Processing'",
             (order_id,)
         )
 
+        if cursor.rowcount == 1:
+            return {
+                "success": True,
+                "message": f"Order {order_id} cancelled successfully"
+            }
+
+        # Nothing updated: look up why (missing order vs. wrong status)
+        cursor.execute("SELECT status FROM orders WHERE id = ?", (order_id,))
+        row = cursor.fetchone()
+
+    if not row:
+        return {"success": False, "message": f"Order {order_id} not found"}
+
     return {
-        "success": True,
-        "message": f"Order {order_id} cancelled successfully"
+        "success": False,
+        "message": f"Cannot cancel order {order_id}. Status is '{row['status']}'. "
+                  "Only orders with status 'Processing' can be cancelled."
     }
 
 
@@ -314,24 +400,81 @@ def cancel_order(order_id: str) -> Dict[str, Any]:
 # Combined Operations
 # ============================================================================
 
-def get_customer_with_orders(customer_id: str) -> Optional[Dict[str, Any]]:
+def get_customer_with_orders_joined(key: str, value: str) -> Optional[Dict[str, Any]]:
     """
-    Get customer information with all their orders.
+    Get a customer and all their orders with a single JOIN query.
 
     Args:
-        customer_id: Customer ID
+        key: Lookup field ('customer_id', 'email', 'phone', or 'username')
+        value: Lookup value
 
     Returns:
         Dict with customer info and orders list, or None if customer not found
+
+    Raises:
+        ValueError: If key is not a valid lookup field
     """
-    customer = get_customer(customer_id)
+    valid_keys = ['customer_id', 'email', 'phone', 'username']
+    if key not in valid_keys:
+        raise ValueError(f"Invalid search key: {key}. Must be one of {valid_keys}")
 
-    if not customer:
-        return None
+    # phone is not UNIQUE, so resolve the lookup to a single customer first
+    # (as search_customer does) instead of joining every match
+    column = "id" if key == "customer_id" else key
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT c.id, c.name, c.email, c.phone, c.username,
+                   o.id AS order_id, o.product, o.quantity, o.price, o.status
+            FROM customers c
+            LEFT JOIN orders o ON o.customer_id = c.id
+            WHERE c.id = (SELECT id FROM customers WHERE {column} = ? LIMIT 1)
+            ORDER BY o.id
+            """,
+            (value,)
+        )
 
-    orders = get_customer_orders(customer_id)
+        customer = None
+        orders = []
+        for row in cursor:
+            if customer is None:
+                customer = {
+                    "id": row["id"],
+                    "name": row["name"],
+                    "email": row["email"],
+                    "phone": row["phone"],
+                    "username": row["username"]
+                }
+            # LEFT JOIN yields one row with NULL order columns if no orders
+            if row["order_id"] is not None:
+                orders.append({
+                    "id": row["order_id"],
+                    "customer_id": row["id"],
+                    "product": row["product"],
+                    "quantity": row["quantity"],
+                    "price": row["price"],
+                    "status": row["status"]
+                })
+
+    if customer is None:
+        return None
 
     return {
         "customer": customer,
         "orders": orders
     }
+
+
+def get_customer_with_orders(customer_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get customer information with all their orders.
+
+    Args:
+        customer_id: Customer ID
+
+    Returns:
+        Dict with customer info and orders list, or None if customer not found
+    """
+    return get_customer_with_orders_joined("customer_id", customer_id)
@@ -7,10 +7,24 @@ Main application file with API routes for:
 - Order management
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.utils import is_body_allowed_for_status_code
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
-from typing import List, Optional
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from typing import Any, List, Optional
+from pathlib import Path
+import logging
+import orjson
+
+# Load environment variables from .env (look in parent directory).
+# Must run before importing ai_tools, which reads ANTHROPIC_API_KEY at import.
+env_path = Path(__file__).parent.parent / '.env'
+load_dotenv(dotenv_path=env_path)
 
 import database as db
 import ai_tools
@@ -23,22 +37,60 @@ from models import (
     ChatMessage,
     ChatResponse,
     CustomerWithOrders,
-    ErrorResponse
+    ErrorResponse,
+    CUSTOMER_LIST_ADAPTER,
+    ORDER_LIST_ADAPTER,
+    CUSTOMER_WITH_ORDERS_ADAPTER
 )
 
-# Load environment variables from .env (look in parent directory)
-import os
-from pathlib import Path
+logger = logging.getLogger(__name__)
+
+
+def _configure_startup_logging() -> None:
+    """
+    Make the app's INFO startup messages visible when the server starts.
+
+    uvicorn configures only its own loggers. basicConfig is a no-op if the
+    host already set up logging, and the root level stays at WARNING so
+    other libraries (e.g. the Anthropic SDK's httpx client) stay quiet.
+    Called from lifespan rather than at import, so importing this module
+    never touches logging configuration.
+    """
+    logging.basicConfig(format="%(message)s")
+    for name in (__name__, db.__name__):
+        logging.getLogger(name).setLevel(logging.INFO)
+
+# ============================================================================
+# Lifespan (startup/shutdown)
+# ============================================================================
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize database on startup."""
+    _configure_startup_logging()
+    logger.info("🚀 Starting Blackbird Customer Support API...")
+    logger.info("📊 Initializing database...")
+    # Blocking SQLite work runs off the event loop; this also opens (pre-warms)
+    # the persistent connection of the worker thread it runs on
+    await run_in_threadpool(db.init_database)
+    logger.info("✅ Database initialized")
+    # Build the OpenAPI schema now (FastAPI caches it) rather than on the
+    # first /docs or /openapi.json request
+    app.openapi()
+    logger.info("🤖 Claude AI integration ready")
+    logger.info("📡 API available at http://localhost:8000")
+    logger.info("📚 Docs available at http://localhost:8000/docs")
+    yield
 
-# Get the parent directory (project root)
-env_path = Path(__file__).parent.parent / '.env'
-load_dotenv(dotenv_path=env_path)
 
 # Create FastAPI app
 app = FastAPI(
     title="Blackbird Customer Support API",
     description="FastAPI backend with Claude AI integration for customer support",
-    version="0.1.0"
+    version="0.1.0",
+    # orjson instead of stdlib json for every response body
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS for React frontend
@@ -54,6 +106,32 @@ app.add_middleware(
 )
 
 
+def _adapter_response(adapter: TypeAdapter, data: Any) -> Response:
+    """
+    Validate DB rows and encode them to JSON in a single pydantic-core pass.
+
+    Used by list and nested endpoints instead of FastAPI's per-response_model
+    handling.
+    """
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(data)),
+        media_type="application/json"
+    )
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    """Encode error responses with orjson too (default handler uses stdlib json)."""
+    # Same as FastAPI's default handler: no body for e.g. 204/304
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=exc.headers)
+    return ORJSONResponse(
+        {"detail": exc.detail},
+        status_code=exc.status_code,
+        headers=exc.headers
+    )
+
+
 # ============================================================================
 # Health Check
 # ============================================================================
@@ -69,7 +147,7 @@ def health_check():
 # ============================================================================
 
 @app.post("/api/chat", response_model=ChatResponse)
-def chat(message: ChatMessage):
+async def chat(message: ChatMessage):
     """
     Send a message to Claude AI assistant.
 
@@ -85,7 +163,7 @@ def chat(message: ChatMessage):
     - "Cancel order 47652"
     """
     try:
-        result = ai_tools.process_chat_message(message.message)
+        result = await ai_tools.process_chat_message(message.message)
         return ChatResponse(
             response=result["response"],
             tool_calls=result.get("tool_calls")
@@ -94,6 +172,23 @@ def chat(message: ChatMessage):
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(message: ChatMessage):
+    """
+    Send a message to Claude AI and stream the reply as Server-Sent Events.
+
+    Each event is a `data:` line holding a JSON object:
+    - {"type": "delta", "text": "..."} for each chunk of response text
+    - {"type": "done", "tool_calls": [...]} once the reply is complete
+    - {"type": "error", "message": "..."} if the stream ends early
+    """
+    async def event_stream():
+        async for event in ai_tools.stream_chat_message(message.message):
+            yield f"data: {orjson.dumps(event).decode()}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 # ============================================================================
 # Customer Endpoints
 # ============================================================================
@@ -103,7 +198,7 @@ def get_customers():
     """Get all customers."""
     try:
         customers = db.get_all_customers()
-        return customers
+        return _adapter_response(CUSTOMER_LIST_ADAPTER, customers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -165,6 +260,9 @@ def update_customer(customer_id: str, update: CustomerUpdate):
         if not success:
             raise HTTPException(status_code=500, detail="Update failed")
 
+        # Cached AI tool lookups may now be stale
+        ai_tools.invalidate_read_cache()
+
         # Return updated customer
         updated_customer = db.get_customer(customer_id)
         return updated_customer
@@ -184,7 +282,7 @@ def get_customer_with_orders(customer_id: str):
         result = db.get_customer_with_orders(customer_id)
         if not result:
             raise HTTPException(status_code=404, detail=f"Customer {customer_id} not found")
-        return result
+        return _adapter_response(CUSTOMER_WITH_ORDERS_ADAPTER, result)
     except HTTPException:
         raise
     except Exception as e:
@@ -205,7 +303,7 @@ def get_orders(status: Optional[str] = Query(None, description="Filter by status
     """
     try:
         orders = db.get_all_orders(status=status)
-        return orders
+        return _adapter_response(ORDER_LIST_ADAPTER, orders)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -229,6 +327,7 @@ def cancel_order(order_id: str):
     """
     try:
         result = db.cancel_order(order_id)
+        ai_tools.invalidate_read_cache()
         if not result["success"]:
             # Return 400 if cancellation not allowed (e.g., order already shipped)
             raise HTTPException(status_code=400, detail=result["message"])
@@ -239,22 +338,6 @@ def cancel_order(order_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# ============================================================================
-# Startup Event
-# ============================================================================
-
-@app.on_event("startup")
-def startup_event():
-    """Initialize database on startup."""
-    print("🚀 Starting Blackbird Customer Support API...")
-    print("📊 Initializing database...")
-    db.init_database()
-    print("✅ Database initialized")
-    print("🤖 Claude AI integration ready")
-    print("📡 API available at http://localhost:8000")
-    print("📚 Docs available at http://localhost:8000/docs")
-
-
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
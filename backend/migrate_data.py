@@ -7,13 +7,203 @@ Source datasets:
 - dwb2023/blackbird-customers (10 customers)
 - dwb2023/blackbird-orders (13 orders)
 
+Datasets are saved to DATASET_CACHE_DIR after the first download and loaded
+from there on later runs, so the Hub is only contacted once. Delete the
+directory to force a fresh download.
+
+Each run replaces the contents of both tables with the datasets, inside a
+single transaction.
+
 Usage:
     python migrate_data.py
 """
 
+import logging
+import os
+import shutil
 import sqlite3
-from datasets import load_dataset
-from database import init_database, DATABASE_PATH
+import sys
+import tempfile
+import pyarrow as pa
+import pyarrow.compute as pc
+from concurrent.futures import ThreadPoolExecutor
+from datasets import load_dataset, load_from_disk
+from typing import Iterator, List, Set, Tuple
+from database import init_database, DATABASE_PATH, CONNECTION_PRAGMAS
+
+logger = logging.getLogger(__name__)
+
+# Rows per Arrow record batch fed to executemany
+BATCH_SIZE = 1000
+
+# Local Arrow copies of the HuggingFace datasets, next to this script
+# regardless of the working directory (backend/dataset_cache/)
+DATASET_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dataset_cache")
+
+# Allowed orders.status values (mirrors the CHECK in SCHEMA_SQL)
+ORDER_STATUSES = frozenset(('Processing', 'Shipped', 'Delivered', 'Cancelled'))
+
+
+def load_split(name: str):
+    """
+    Load the train split of a HuggingFace dataset, reusing the local copy.
+
+    The first call downloads the dataset and saves it with save_to_disk;
+    afterwards it is memory-mapped straight from the saved Arrow files
+    without consulting the Hub. The copy is written to a temporary directory
+    and renamed into place, so an interrupted save never leaves a partial
+    cache behind; an unreadable cache is discarded and downloaded again.
+
+    Args:
+        name: Dataset name on the Hub (e.g. "dwb2023/blackbird-customers")
+    """
+    path = os.path.join(DATASET_CACHE_DIR, name.replace("/", "__"))
+    if os.path.isdir(path):
+        try:
+            return load_from_disk(path)
+        except Exception as e:
+            logger.warning("    ⚠ Discarding unreadable dataset cache %s: %s", path, e)
+            shutil.rmtree(path, ignore_errors=True)
+
+    dataset = load_dataset(name, split="train")
+
+    os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+    # Same directory as the target, so the rename is atomic
+    tmp_path = tempfile.mkdtemp(prefix=".tmp-", dir=DATASET_CACHE_DIR)
+    try:
+        dataset.save_to_disk(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return dataset
+
+
+def customer_passes_checks(row: Tuple) -> bool:
+    """
+    Check a customer row against the NOT NULL and CHECK constraints of the
+    customers table, so a bad row can be skipped instead of aborting the
+    whole executemany batch.
+
+    Args:
+        row: (id, name, email, phone, username)
+    """
+    if any(value is None for value in row):
+        return False
+    _, name, email, phone, username = row
+    # email LIKE '%@%.%': an "@" followed somewhere later by a "."
+    at = email.find('@')
+    return (
+        len(name) >= 1
+        and at != -1
+        and email.find('.', at + 1) != -1
+        and len(phone) >= 10
+        and 3 <= len(username) <= 20
+    )
+
+
+def order_passes_checks(row: Tuple) -> bool:
+    """
+    Check an order row against the NOT NULL and CHECK constraints of the
+    orders table.
+
+    Args:
+        row: (id, customer_id, product, quantity, price, status)
+    """
+    if any(value is None for value in row):
+        return False
+    _, _, product, quantity, price, status = row
+    return len(product) >= 1 and quantity > 0 and price >= 0 and status in ORDER_STATUSES
+
+
+def iter_customer_rows(customers, seen_ids: Set[str], invalid_ids: List[str]) -> Iterator[Tuple]:
+    """
+    Yield customer rows for INSERT, one Arrow record batch at a time.
+
+    Rows failing the table's CHECK constraints are dropped and their ids
+    collected in invalid_ids. Duplicates are dropped so the batch insert
+    never hits a UNIQUE constraint (id, email and username are unique).
+    Accepted ids are added to seen_ids.
+
+    Args:
+        customers: HuggingFace customers dataset
+        seen_ids: Set filled with the ids of the yielded customers
+        invalid_ids: List filled with the ids of customers failing the checks
+    """
+    seen_emails, seen_usernames = set(), set()
+    table = customers.with_format("arrow")[:]
+
+    # Clean phone numbers (remove "updated_" prefix if present) with a single
+    # Arrow kernel over the whole column instead of str.replace per row
+    phone_index = table.schema.get_field_index('phone')
+    table = table.set_column(
+        phone_index,
+        'phone',
+        pc.replace_substring(table.column(phone_index), pattern='updated_', replacement='')
+    )
+
+    for batch in table.to_batches(max_chunksize=BATCH_SIZE):
+        columns = batch.to_pydict()
+
+        for row in zip(columns['id'], columns['name'], columns['email'], columns['phone'], columns['username']):
+            customer_id, _, email, _, username = row
+            if not customer_passes_checks(row):
+                logger.warning("    ⚠ Skipped customer %s: fails schema checks", customer_id)
+                invalid_ids.append(customer_id)
+                continue
+            if customer_id in seen_ids or email in seen_emails or username in seen_usernames:
+                logger.warning("    ⚠ Skipped duplicate customer %s", customer_id)
+                continue
+            seen_ids.add(customer_id)
+            seen_emails.add(email)
+            seen_usernames.add(username)
+            yield row
+
+
+def iter_order_rows(orders, customer_ids: Set[str], orphaned_ids: List[str],
+                    invalid_ids: List[str]) -> Iterator[Tuple]:
+    """
+    Yield order rows for INSERT, one Arrow record batch at a time.
+
+    Orders whose customer_id is not among the migrated customers are
+    filtered out of the whole table up front; their ids are collected in
+    orphaned_ids so they can be reported once. While iterating, rows failing
+    the table's CHECK constraints are dropped into invalid_ids, and orders
+    with an already-seen id are dropped.
+
+    Args:
+        orders: HuggingFace orders dataset
+        customer_ids: Ids of the customers inserted by this migration
+        orphaned_ids: List filled with the ids of orders with unknown customers
+        invalid_ids: List filled with the ids of orders failing the checks
+    """
+    seen_order_ids = set()
+    table = orders.with_format("arrow")[:]
+
+    # Foreign key check as one vectorized membership test against the
+    # customer ids, instead of a set lookup per row
+    customer_id_type = table.schema.field('customer_id').type
+    has_customer = pc.is_in(
+        table.column('customer_id'),
+        value_set=pa.array(list(customer_ids), type=customer_id_type)
+    )
+    orphaned_ids.extend(table.filter(pc.invert(has_customer)).column('id').to_pylist())
+    table = table.filter(has_customer)
+
+    for batch in table.to_batches(max_chunksize=BATCH_SIZE):
+        columns = batch.to_pydict()
+
+        for row in zip(columns['id'], columns['customer_id'], columns['product'],
+                       columns['quantity'], columns['price'], columns['status']):
+            if not order_passes_checks(row):
+                logger.warning("    ⚠ Skipped order %s: fails schema checks", row[0])
+                invalid_ids.append(row[0])
+                continue
+            if row[0] in seen_order_ids:
+                logger.warning("    ⚠ Skipped duplicate order %s", row[0])
+                continue
+            seen_order_ids.add(row[0])
+            yield row
 
 
 def migrate():
@@ -27,154 +217,178 @@ def migrate():
     4. Insert orders
     5. Verify migration
     """
-    print("=" * 60)
-    print("Blackbird Data Migration: HuggingFace → SQLite")
-    print("=" * 60)
+    logger.info("=" * 60)
+    logger.info("Blackbird Data Migration: HuggingFace → SQLite")
+    logger.info("=" * 60)
 
     # Step 1: Initialize database schema
-    print("\n[1/5] Initializing database schema...")
+    logger.info("\n[1/5] Initializing database schema...")
     init_database()
 
     # Step 2: Load HuggingFace datasets
-    print("\n[2/5] Loading HuggingFace datasets...")
-    print("  - Loading dwb2023/blackbird-customers...")
-    customers = load_dataset("dwb2023/blackbird-customers", split="train")
-    print(f"    ✓ Loaded {len(customers)} customers")
-
-    print("  - Loading dwb2023/blackbird-orders...")
-    orders = load_dataset("dwb2023/blackbird-orders", split="train")
-    print(f"    ✓ Loaded {len(orders)} orders")
+    logger.info("\n[2/5] Loading HuggingFace datasets...")
+    logger.info("  - Loading dwb2023/blackbird-customers...")
+    logger.info("  - Loading dwb2023/blackbird-orders...")
+    # The two downloads are independent, so overlap their network/disk waits
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        customers_future = executor.submit(load_split, "dwb2023/blackbird-customers")
+        orders_future = executor.submit(load_split, "dwb2023/blackbird-orders")
+        customers = customers_future.result()
+        orders = orders_future.result()
+    logger.info("    ✓ Loaded %s customers", len(customers))
+    logger.info("    ✓ Loaded %s orders", len(orders))
 
     # Step 3: Insert customers
-    print("\n[3/5] Migrating customers...")
+    logger.info("\n[3/5] Migrating customers...")
     conn = sqlite3.connect(DATABASE_PATH)
+    conn.row_factory = sqlite3.Row
+
+    # Bulk-load tuning: WAL + synchronous=NORMAL avoid an fsync per commit,
+    # plus a large page cache, in-memory temp storage and a busy timeout
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+
+    # No per-row foreign key checks during the load; integrity is verified
+    # once with an orphan count afterwards. (Must be set outside a
+    # transaction to take effect.)
+    conn.execute("PRAGMA foreign_keys = OFF")
     cursor = conn.cursor()
 
-    # Clear existing data
-    cursor.execute("DELETE FROM orders")  # Delete orders first (foreign key constraint)
-    cursor.execute("DELETE FROM customers")
+    # Everything from the index drop to the last INSERT is one transaction, so
+    # the whole load is bounded by a single commit
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Drop secondary indexes so inserts don't maintain them row by row;
+        # they are rebuilt in one pass after the load. Indexes backing
+        # PRIMARY KEY/UNIQUE constraints have no SQL and cannot be dropped.
+        secondary_indexes = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+        ).fetchall()
+        for name, _ in secondary_indexes:
+            conn.execute(f"DROP INDEX {name}")
 
-    inserted_customers = 0
-    for customer in customers:
-        try:
-            # Clean phone number (remove "updated_" prefix if present)
-            phone = customer['phone'].replace('updated_', '')
-
-            cursor.execute(
-                """
-                INSERT INTO customers (id, name, email, phone, username)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (
-                    customer['id'],
-                    customer['name'],
-                    customer['email'],
-                    phone,
-                    customer['username']
-                )
-            )
-            inserted_customers += 1
-        except sqlite3.IntegrityError as e:
-            print(f"    ⚠ Skipped customer {customer['id']}: {e}")
-
-    conn.commit()
-    print(f"  ✓ Migrated {inserted_customers} customers")
-
-    # Step 4: Insert orders
-    print("\n[4/5] Migrating orders...")
-    inserted_orders = 0
-    skipped_orders = 0
-
-    for order in orders:
-        try:
-            cursor.execute(
-                """
-                INSERT INTO orders (id, customer_id, product, quantity, price, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    order['id'],
-                    order['customer_id'],
-                    order['product'],
-                    order['quantity'],
-                    order['price'],
-                    order['status']
-                )
-            )
-            inserted_orders += 1
-        except sqlite3.IntegrityError as e:
-            print(f"    ⚠ Skipped order {order['id']}: {e}")
-            skipped_orders += 1
-
-    conn.commit()
-    print(f"  ✓ Migrated {inserted_orders} orders")
-    if skipped_orders > 0:
-        print(f"  ⚠ Skipped {skipped_orders} orders (foreign key or duplicate errors)")
+        # Clean slate in the same transaction. Upserting instead would let a
+        # unique email/username that moved to another id between runs abort
+        # the load. With foreign keys off and no WHERE clause, SQLite drops
+        # the table pages wholesale (truncate optimization) rather than
+        # deleting row by row.
+        conn.execute("DELETE FROM orders")
+        conn.execute("DELETE FROM customers")
 
-    # Step 5: Verify migration
-    print("\n[5/5] Verifying migration...")
+        # Rows are streamed from generators, so memory stays bounded by
+        # BATCH_SIZE instead of holding every row as a tuple
+        customer_ids = set()
+        invalid_customer_ids = []
+        cursor.executemany(
+            """
+            INSERT INTO customers (id, name, email, phone, username)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            iter_customer_rows(customers, customer_ids, invalid_customer_ids)
+        )
+
+        inserted_customers = len(customer_ids)
+        logger.info("  ✓ Migrated %s customers", inserted_customers)
+        if invalid_customer_ids:
+            logger.warning("  ⚠ Skipped %s customers failing schema checks", len(invalid_customer_ids))
 
-    # Count customers
-    cursor.execute("SELECT COUNT(*) FROM customers")
-    customer_count = cursor.fetchone()[0]
-    print(f"  - Customers in database: {customer_count}")
+        # Step 4: Insert orders
+        logger.info("\n[4/5] Migrating orders...")
+        # Orders are checked against the customers above and against the
+        # schema CHECKs before the insert, so the batch never writes a
+        # dangling customer_id or aborts on one bad row
+        orphaned_ids = []
+        invalid_order_ids = []
+        cursor.executemany(
+            """
+            INSERT INTO orders (id, customer_id, product, quantity, price, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            iter_order_rows(orders, customer_ids, orphaned_ids, invalid_order_ids)
+        )
+        inserted_orders = cursor.rowcount
 
-    # Count orders
-    cursor.execute("SELECT COUNT(*) FROM orders")
-    order_count = cursor.fetchone()[0]
-    print(f"  - Orders in database: {order_count}")
+        # Rebuild the secondary indexes over the loaded data
+        for _, sql in secondary_indexes:
+            conn.execute(sql)
 
-    # Verify foreign key integrity
-    cursor.execute(
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    skipped_orders = len(orders) - inserted_orders - len(orphaned_ids) - len(invalid_order_ids)
+    logger.info("  ✓ Migrated %s orders", inserted_orders)
+    if skipped_orders > 0:
+        logger.warning("  ⚠ Skipped %s orders (duplicate IDs)", skipped_orders)
+    if orphaned_ids:
+        logger.warning("  ⚠ Skipped %s orders with unknown customer_id", len(orphaned_ids))
+    if invalid_order_ids:
+        logger.warning("  ⚠ Skipped %s orders failing schema checks", len(invalid_order_ids))
+
+    # Step 5: Verify migration
+    logger.info("\n[5/5] Verifying migration...")
+
+    # Row counts and foreign key integrity for the whole load in one statement
+    stats = cursor.execute(
         """
-        SELECT COUNT(*) FROM orders o
-        LEFT JOIN customers c ON o.customer_id = c.id
-        WHERE c.id IS NULL
+        SELECT
+            (SELECT COUNT(*) FROM customers) AS customer_count,
+            (SELECT COUNT(*) FROM orders) AS order_count,
+            (SELECT COUNT(*) FROM orders o
+             LEFT JOIN customers c ON o.customer_id = c.id
+             WHERE c.id IS NULL) AS orphaned_orders
         """
-    )
-    orphaned_orders = cursor.fetchone()[0]
+    ).fetchone()
+    customer_count = stats['customer_count']
+    order_count = stats['order_count']
+    orphaned_orders = stats['orphaned_orders']
+
+    logger.info("  - Customers in database: %s", customer_count)
+    logger.info("  - Orders in database: %s", order_count)
 
     if orphaned_orders > 0:
-        print(f"  ⚠ WARNING: {orphaned_orders} orders have invalid customer_id!")
+        logger.warning("  ⚠ WARNING: %s orders have invalid customer_id!", orphaned_orders)
     else:
-        print("  ✓ All orders have valid customer references")
+        logger.info("  ✓ All orders have valid customer references")
 
     # Show sample data
-    print("\n" + "=" * 60)
-    print("Sample Data")
-    print("=" * 60)
+    logger.info("\n" + "=" * 60)
+    logger.info("Sample Data")
+    logger.info("=" * 60)
 
-    print("\nCustomers (first 3):")
-    cursor.execute("SELECT * FROM customers LIMIT 3")
-    for row in cursor.fetchall():
-        print(f"  ID: {row[0]}, Name: {row[1]}, Email: {row[2]}")
+    logger.info("\nCustomers (first 3):")
+    for row in cursor.execute("SELECT id, name, email FROM customers LIMIT 3"):
+        logger.info("  ID: %s, Name: %s, Email: %s", row['id'], row['name'], row['email'])
 
-    print("\nOrders (first 3):")
-    cursor.execute("SELECT * FROM orders LIMIT 3")
-    for row in cursor.fetchall():
-        print(f"  ID: {row[0]}, Customer: {row[1]}, Product: {row[2]}, Status: {row[5]}")
+    logger.info("\nOrders (first 3):")
+    for row in cursor.execute("SELECT id, customer_id, product, status FROM orders LIMIT 3"):
+        logger.info(
+            "  ID: %s, Customer: %s, Product: %s, Status: %s",
+            row['id'], row['customer_id'], row['product'], row['status']
+        )
 
     conn.close()
 
     # Final summary
-    print("\n" + "=" * 60)
-    print("Migration Complete!")
-    print("=" * 60)
-    print(f"✓ Database: {DATABASE_PATH}")
-    print(f"✓ Customers: {customer_count}")
-    print(f"✓ Orders: {order_count}")
-    print("\nNext steps:")
-    print("  1. Start backend: uvicorn main:app --reload")
-    print("  2. View API docs: http://localhost:8000/docs")
-    print("  3. Start frontend: cd frontend && npm run dev")
-    print("=" * 60)
+    logger.info("\n" + "=" * 60)
+    logger.info("Migration Complete!")
+    logger.info("=" * 60)
+    logger.info("✓ Database: %s", DATABASE_PATH)
+    logger.info("✓ Customers: %s", customer_count)
+    logger.info("✓ Orders: %s", order_count)
+    logger.info("\nNext steps:")
+    logger.info("  1. Start backend: uvicorn main:app --reload")
+    logger.info("  2. View API docs: http://localhost:8000/docs")
+    logger.info("  3. Start frontend: cd frontend && npm run dev")
+    logger.info("=" * 60)
 
 
 if __name__ == "__main__":
+    # Plain messages on stdout, as the script's output has always looked
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     try:
         migrate()
     except Exception as e:
-        print(f"\n❌ Migration failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("\n❌ Migration failed: %s", e)
         exit(1)
@@ -4,8 +4,54 @@ Pydantic models for request/response validation.
 Defines data schemas for Customer, Order, and Chat interactions.
 """
 
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, Literal, List, Dict, Any
+from enum import StrEnum
+from functools import lru_cache
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, TypeAdapter, WithJsonSchema
+from pydantic.networks import validate_email
+from typing import Annotated, Optional, List, Dict, Any
+
+
+# ============================================================================
+# Custom Types
+# ============================================================================
+
+@lru_cache(maxsize=10000)
+def _validate_email_cached(value: str) -> str:
+    """Validate and normalize an email address, once per distinct value."""
+    return validate_email(value)[1]
+
+
+# Same validation and JSON schema as EmailStr, but the same addresses come
+# back on every customer list, so each is parsed by email-validator only once
+# (invalid values raise and are not cached)
+CachedEmailStr = Annotated[
+    str,
+    AfterValidator(_validate_email_cached),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
+
+
+# ============================================================================
+# Enums
+# ============================================================================
+
+# StrEnum members compare and hash equal to their values, so they work as
+# plain strings in SQL parameters, dict lookups and f-strings. Validation is
+# a single lookup, and every validated order shares the same status object.
+
+class CustomerSearchKey(StrEnum):
+    """Customer fields that can be searched on."""
+    EMAIL = 'email'
+    PHONE = 'phone'
+    USERNAME = 'username'
+
+
+class OrderStatus(StrEnum):
+    """Order lifecycle status."""
+    PROCESSING = 'Processing'
+    SHIPPED = 'Shipped'
+    DELIVERED = 'Delivered'
+    CANCELLED = 'Cancelled'
 
 
 # ============================================================================
@@ -20,7 +66,7 @@ class Customer(BaseModel):
     """
     id: str = Field(..., pattern=r'^\d{7}$', description="7-digit customer ID")
     name: str = Field(..., min_length=1, max_length=100, description="Customer full name")
-    email: EmailStr = Field(..., description="Customer email address")
+    email: CachedEmailStr = Field(..., description="Customer email address")
     phone: str = Field(..., pattern=r'^\d{3}-\d{3}-\d{4}$', description="Phone in XXX-XXX-XXXX format")
     username: str = Field(
         ...,
@@ -30,8 +76,8 @@ class Customer(BaseModel):
         description="Username (alphanumeric + underscore)"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "id": "1213210",
                 "name": "John Doe",
@@ -40,6 +86,7 @@ class Customer(BaseModel):
                 "username": "johndoe"
             }
         }
+    )
 
 
 class CustomerUpdate(BaseModel):
@@ -48,16 +95,17 @@ class CustomerUpdate(BaseModel):
 
     Allows updating email and/or phone. At least one field must be provided.
     """
-    email: Optional[EmailStr] = Field(None, description="New email address")
+    email: Optional[CachedEmailStr] = Field(None, description="New email address")
     phone: Optional[str] = Field(None, pattern=r'^\d{3}-\d{3}-\d{4}$', description="New phone in XXX-XXX-XXXX format")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "email": "newemail@example.com",
                 "phone": "555-123-4567"
             }
         }
+    )
 
 
 class CustomerSearch(BaseModel):
@@ -66,16 +114,17 @@ class CustomerSearch(BaseModel):
 
     Search by email, phone, or username.
     """
-    key: Literal['email', 'phone', 'username'] = Field(..., description="Field to search by")
+    key: CustomerSearchKey = Field(..., description="Field to search by")
     value: str = Field(..., min_length=1, description="Value to search for")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "key": "email",
                 "value": "john@example.com"
             }
         }
+    )
 
 
 # ============================================================================
@@ -93,13 +142,13 @@ class Order(BaseModel):
     product: str = Field(..., min_length=1, max_length=200, description="Product name")
     quantity: int = Field(..., gt=0, le=999, description="Quantity ordered")
     price: float = Field(..., ge=0, lt=10000, description="Price per unit")
-    status: Literal['Processing', 'Shipped', 'Delivered', 'Cancelled'] = Field(
+    status: OrderStatus = Field(
         ...,
         description="Order status"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "id": "24601",
                 "customer_id": "1213210",
@@ -109,6 +158,7 @@ class Order(BaseModel):
                 "status": "Processing"
             }
         }
+    )
 
 
 class OrderCancelResponse(BaseModel):
@@ -118,13 +168,14 @@ class OrderCancelResponse(BaseModel):
     success: bool = Field(..., description="Whether cancellation succeeded")
     message: str = Field(..., description="Cancellation result message")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "success": True,
                 "message": "Order 24601 cancelled successfully"
             }
         }
+    )
 
 
 # ============================================================================
@@ -139,12 +190,13 @@ class ChatMessage(BaseModel):
     """
     message: str = Field(..., min_length=1, max_length=4000, description="User's chat message")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "message": "Look up customer with email john@example.com"
             }
         }
+    )
 
 
 class ChatResponse(BaseModel):
@@ -159,8 +211,8 @@ class ChatResponse(BaseModel):
         description="List of tools called by AI (for debugging/transparency)"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "response": "I found the customer John Doe (ID: 1213210) with email john@example.com. "
                            "They have 2 orders on file.",
@@ -176,6 +228,7 @@ class ChatResponse(BaseModel):
                 ]
             }
         }
+    )
 
 
 # ============================================================================
@@ -191,8 +244,8 @@ class CustomerWithOrders(BaseModel):
     customer: Customer
     orders: List[Order]
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "customer": {
                     "id": "1213210",
@@ -213,6 +266,7 @@ class CustomerWithOrders(BaseModel):
                 ]
             }
         }
+    )
 
 
 # ============================================================================
@@ -226,10 +280,22 @@ class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Additional error details")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "error": "Customer not found",
                 "detail": "No customer exists with ID 9999999"
             }
         }
+    )
+
+
+# ============================================================================
+# Response Adapters
+# ============================================================================
+
+# Validate and serialize whole responses in one pydantic-core call, with the
+# schema compiled once at import
+CUSTOMER_LIST_ADAPTER = TypeAdapter(List[Customer])
+ORDER_LIST_ADAPTER = TypeAdapter(List[Order])
+CUSTOMER_WITH_ORDERS_ADAPTER = TypeAdapter(CustomerWithOrders)
@@ -0,0 +1,74 @@
+"""
+Tests for the read-only tool result cache in ai_tools.execute_tool.
+
+Tool handlers are replaced with in-memory fakes, so no database or
+ANTHROPIC_API_KEY is needed.
+
+Run with: pytest test_ai_tools.py
+"""
+
+import threading
+
+import pytest
+
+import ai_tools
+
+
+@pytest.fixture
+def orders(monkeypatch):
+    """Fake get_order_by_id/cancel_order handlers over an in-memory order."""
+    state = {"24601": "Processing"}
+    read_started = threading.Event()
+    release_read = threading.Event()
+    release_read.set()
+
+    def get_order_by_id(tool_input):
+        status = state[tool_input["order_id"]]
+        read_started.set()
+        release_read.wait(timeout=5)
+        return {"id": tool_input["order_id"], "status": status}
+
+    def cancel_order(tool_input):
+        state[tool_input["order_id"]] = "Cancelled"
+        return {"success": True, "message": "cancelled"}
+
+    monkeypatch.setitem(ai_tools._DISPATCH, "get_order_by_id", get_order_by_id)
+    monkeypatch.setitem(ai_tools._DISPATCH, "cancel_order", cancel_order)
+    ai_tools.invalidate_read_cache()
+    yield read_started, release_read
+    ai_tools.invalidate_read_cache()
+
+
+def read_status():
+    return ai_tools.execute_tool("get_order_by_id", {"order_id": "24601"})["status"]
+
+
+def test_write_tool_invalidates_cached_reads(orders):
+    """A cached read is dropped once a write tool runs."""
+    assert read_status() == "Processing"
+    # Served from the cache
+    assert ("get_order_by_id", (("order_id", "24601"),)) in ai_tools._READ_CACHE
+
+    ai_tools.execute_tool("cancel_order", {"order_id": "24601"})
+
+    assert read_status() == "Cancelled"
+
+
+def test_read_overlapping_write_is_not_cached(orders):
+    """A read that saw pre-write data must not cache it after the write."""
+    read_started, release_read = orders
+    release_read.clear()
+
+    results = []
+    reader = threading.Thread(target=lambda: results.append(read_status()))
+    reader.start()
+    # The reader has fetched "Processing" and is paused before storing it
+    assert read_started.wait(timeout=5)
+
+    ai_tools.execute_tool("cancel_order", {"order_id": "24601"})
+    release_read.set()
+    reader.join(timeout=5)
+
+    assert results == ["Processing"]
+    assert not ai_tools._READ_CACHE
+    assert read_status() == "Cancelled"
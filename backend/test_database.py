@@ -0,0 +1,70 @@
+"""
+Tests for the SQLite data access layer (database.py).
+
+Each test runs against a fresh database file in a temporary directory.
+
+Run with: pytest test_database.py
+"""
+
+import threading
+
+import pytest
+
+import ai_tools
+import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Fresh schema with two customers sharing a phone number."""
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "blackbird.db"))
+    # Drop any per-thread connection opened against another path
+    monkeypatch.setattr(database, "_local", threading.local())
+    database.init_database()
+
+    with database.get_db() as conn:
+        conn.executemany(
+            "INSERT INTO customers (id, name, email, phone, username) VALUES (?, ?, ?, ?, ?)",
+            [
+                ("1000001", "Ann Lee", "ann@example.com", "123-456-7890", "annlee"),
+                ("1000002", "Bob Ray", "bob@example.com", "123-456-7890", "bobray"),
+            ]
+        )
+        conn.executemany(
+            "INSERT INTO orders (id, customer_id, product, quantity, price, status) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                ("10001", "1000001", "Headphones", 1, 79.99, "Shipped"),
+                ("10002", "1000002", "Smart Watch", 1, 199.99, "Processing"),
+            ]
+        )
+
+    ai_tools.invalidate_read_cache()
+    yield database
+    ai_tools.invalidate_read_cache()
+
+
+def test_shared_phone_returns_one_customer_with_own_orders(db):
+    """A non-unique phone resolves to one customer and only their orders."""
+    result = db.get_customer_with_orders_joined("phone", "123-456-7890")
+
+    assert result["customer"] == db.search_customer("phone", "123-456-7890")
+    assert {order["customer_id"] for order in result["orders"]} == {result["customer"]["id"]}
+    assert len(result["orders"]) == 1
+
+
+def test_get_user_info_by_shared_phone_does_not_leak_orders(db):
+    """The get_user_info tool never attaches another customer's orders."""
+    result = ai_tools.execute_tool("get_user_info", {"key": "phone", "value": "123-456-7890"})
+
+    customer_id = result["customer"]["id"]
+    assert all(order["customer_id"] == customer_id for order in result["orders"])
+
+
+def test_lookup_by_unique_key_and_missing_customer(db):
+    """Unique keys behave as before; an unknown value returns None."""
+    result = db.get_customer_with_orders_joined("customer_id", "1000002")
+
+    assert result["customer"]["name"] == "Bob Ray"
+    assert [order["id"] for order in result["orders"]] == ["10002"]
+    assert db.get_customer_with_orders_joined("email", "nobody@example.com") is None
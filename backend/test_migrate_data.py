@@ -0,0 +1,183 @@
+"""
+Tests for the HuggingFace → SQLite migration (migrate_data.py).
+
+The datasets are built in memory, so no Hub access is needed.
+
+Run with: pytest test_migrate_data.py
+"""
+
+import sqlite3
+import threading
+
+import pytest
+from datasets import Dataset
+
+import database
+import migrate_data
+
+
+CUSTOMERS = {
+    "id": ["1213210", "2837622", "3924156"],
+    "name": ["John Doe", "Priya Patel", "Liam Nguyen"],
+    "email": ["john@example.com", "priya@candy.com", "not-an-email"],
+    "phone": ["123-456-7890", "updated_998-877-6655", "222-333-4444"],
+    "username": ["johndoe", "priya123", "liamn"],
+}
+
+ORDERS = {
+    "id": ["24601", "13579", "97531", "11111"],
+    "customer_id": ["1213210", "1213210", "2837622", "2837622"],
+    "product": ["Wireless Headphones", "Smart Watch", "Laptop Stand", "Broken Row"],
+    "quantity": [1, 2, 3, 0],
+    "price": [79.99, 199.99, 29.99, 5.0],
+    "status": ["Shipped", "Processing", "Delivered", "Processing"],
+}
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point the migration and the database module at a fresh database file."""
+    path = str(tmp_path / "blackbird.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    monkeypatch.setattr(migrate_data, "DATABASE_PATH", path)
+    # Drop any per-thread connection opened against another path
+    monkeypatch.setattr(database, "_local", threading.local())
+
+    datasets = {
+        "dwb2023/blackbird-customers": Dataset.from_dict(CUSTOMERS),
+        "dwb2023/blackbird-orders": Dataset.from_dict(ORDERS),
+    }
+    monkeypatch.setattr(migrate_data, "load_split", datasets.__getitem__)
+    return path
+
+
+def test_migration_skips_rows_failing_schema_checks(db_path):
+    """A CHECK-violating row is skipped; the rest of the load is committed."""
+    migrate_data.migrate()
+
+    conn = sqlite3.connect(db_path)
+    customers = dict(conn.execute("SELECT id, phone FROM customers"))
+    order_ids = {row[0] for row in conn.execute("SELECT id FROM orders")}
+    conn.close()
+
+    # Bad email is skipped, phone prefix is cleaned on the others
+    assert customers == {"1213210": "123-456-7890", "2837622": "998-877-6655"}
+    # quantity = 0 is skipped
+    assert order_ids == {"24601", "13579", "97531"}
+
+
+@pytest.mark.parametrize("row", [
+    ("1000001", "Ann", "ann@example.com", "123-456-7890", "annie"),
+    ("1000001", "", "ann@example.com", "123-456-7890", "annie"),
+    ("1000001", "Ann", "ann@example", "123-456-7890", "annie"),
+    ("1000001", "Ann", "ann.example@com", "123-456-7890", "annie"),
+    ("1000001", "Ann", "a@.", "123-456-7890", "annie"),
+    ("1000001", "Ann", "ann@example.com", "123-4567", "annie"),
+    ("1000001", "Ann", "ann@example.com", "123-456-7890", "an"),
+    ("1000001", "Ann", "ann@example.com", "123-456-7890", "a" * 21),
+    ("1000001", None, "ann@example.com", "123-456-7890", "annie"),
+])
+def test_customer_checks_match_schema(row):
+    """customer_passes_checks agrees with the customers table constraints."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(database.SCHEMA_SQL)
+    try:
+        conn.execute("INSERT INTO customers VALUES (?, ?, ?, ?, ?)", row)
+        accepted = True
+    except sqlite3.IntegrityError:
+        accepted = False
+    finally:
+        conn.close()
+
+    assert migrate_data.customer_passes_checks(row) == accepted
+
+
+@pytest.mark.parametrize("row", [
+    ("24601", "1213210", "Headphones", 1, 79.99, "Shipped"),
+    ("24601", "1213210", "", 1, 79.99, "Shipped"),
+    ("24601", "1213210", "Headphones", 0, 79.99, "Shipped"),
+    ("24601", "1213210", "Headphones", 1, -0.01, "Shipped"),
+    ("24601", "1213210", "Headphones", 1, 0.0, "Cancelled"),
+    ("24601", "1213210", "Headphones", 1, 79.99, "Lost"),
+    ("24601", "1213210", "Headphones", None, 79.99, "Shipped"),
+])
+def test_order_checks_match_schema(row):
+    """order_passes_checks agrees with the orders table constraints."""
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(database.SCHEMA_SQL)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        conn.execute("INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)", row)
+        accepted = True
+    except sqlite3.IntegrityError:
+        accepted = False
+    finally:
+        conn.close()
+
+    assert migrate_data.order_passes_checks(row) == accepted
+
+
+def test_rerun_replaces_previous_load(db_path, monkeypatch):
+    """A re-run reflects the new datasets, even when unique values move."""
+    migrate_data.migrate()
+
+    # John and Priya swap emails; Liam comes back valid under a new id
+    customers = dict(CUSTOMERS, id=["1213210", "2837622", "4444444"],
+                     email=["priya@candy.com", "john@example.com", "liam@x.com"])
+    # ...and order 13579 drops out of the source
+    orders = dict(ORDERS, id=["24601", "33333", "97531", "22222"],
+                  customer_id=["1213210", "1213210", "4444444", "2837622"],
+                  quantity=[1, 2, 3, 1])
+    datasets = {
+        "dwb2023/blackbird-customers": Dataset.from_dict(customers),
+        "dwb2023/blackbird-orders": Dataset.from_dict(orders),
+    }
+    monkeypatch.setattr(migrate_data, "load_split", datasets.__getitem__)
+    migrate_data.migrate()
+
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT id, email FROM customers"))
+    order_rows = dict(conn.execute("SELECT id, customer_id FROM orders"))
+    conn.close()
+
+    assert rows == {
+        "1213210": "priya@candy.com",
+        "2837622": "john@example.com",
+        "4444444": "liam@x.com",
+    }
+    assert order_rows == {
+        "24601": "1213210",
+        "33333": "1213210",
+        "97531": "4444444",
+        "22222": "2837622",
+    }
+
+
+def test_load_split_caches_and_recovers(tmp_path, monkeypatch):
+    """Datasets are cached on first load; a broken cache is re-downloaded."""
+    cache_dir = tmp_path / "dataset_cache"
+    monkeypatch.setattr(migrate_data, "DATASET_CACHE_DIR", str(cache_dir))
+    downloads = []
+
+    def fake_load_dataset(name, split):
+        downloads.append(name)
+        return Dataset.from_dict(CUSTOMERS)
+
+    monkeypatch.setattr(migrate_data, "load_dataset", fake_load_dataset)
+    name = "dwb2023/blackbird-customers"
+
+    assert migrate_data.load_split(name)["id"] == CUSTOMERS["id"]
+    assert migrate_data.load_split(name)["id"] == CUSTOMERS["id"]
+    assert downloads == [name]
+    # Only the renamed copy is left, no temporary directories
+    assert [p.name for p in cache_dir.iterdir()] == ["dwb2023__blackbird-customers"]
+
+    # Simulate an interrupted save from an older run
+    cached = cache_dir / "dwb2023__blackbird-customers"
+    for child in cached.iterdir():
+        child.unlink()
+
+    assert migrate_data.load_split(name)["id"] == CUSTOMERS["id"]
+    assert downloads == [name, name]
+    assert migrate_data.load_split(name)["id"] == CUSTOMERS["id"]
+    assert downloads == [name, name]
@@ -0,0 +1,65 @@
+"""
+Tests for the Pydantic models (models.py).
+
+Run with: pytest test_models.py
+"""
+
+import pytest
+from pydantic import BaseModel, EmailStr, ValidationError
+
+from models import Customer, CustomerUpdate
+
+
+class EmailStrModel(BaseModel):
+    """Reference model using pydantic's own EmailStr."""
+    email: EmailStr
+
+
+def make_customer(email):
+    return Customer(
+        id="1213210",
+        name="John Doe",
+        email=email,
+        phone="123-456-7890",
+        username="johndoe",
+    )
+
+
+@pytest.mark.parametrize("email", [
+    "john@example.com",
+    "John.Doe@Example.COM",
+    "user+tag@sub.example.org",
+    "  padded@example.com  ",
+])
+def test_cached_email_normalizes_like_email_str(email):
+    """CachedEmailStr returns the same normalized value as EmailStr."""
+    expected = EmailStrModel(email=email).email
+
+    assert make_customer(email).email == expected
+    assert CustomerUpdate(email=email).email == expected
+    # Second validation is served from the cache
+    assert make_customer(email).email == expected
+
+
+@pytest.mark.parametrize("email", [
+    "not-an-email",
+    "john@",
+    "@example.com",
+    "john@example",
+    "john@@example.com",
+    "",
+])
+def test_cached_email_rejects_like_email_str(email):
+    """CachedEmailStr rejects the same values as EmailStr, every time."""
+    with pytest.raises(ValidationError) as expected:
+        EmailStrModel(email=email)
+
+    for _ in range(2):
+        with pytest.raises(ValidationError) as actual:
+            make_customer(email)
+        assert actual.value.errors()[0]["msg"] == expected.value.errors()[0]["msg"]
+
+
+def test_cached_email_is_optional_on_update():
+    """CustomerUpdate still accepts a missing email."""
+    assert CustomerUpdate(phone="123-456-7890").email is None
@@ -29,6 +29,63 @@ export async function sendChatMessage(message) {
   return response.json();
 }
 
+/**
+ * Send a chat message to Claude AI and stream the reply.
+ *
+ * Reads the Server-Sent Events from /api/chat/stream, calling onDelta with
+ * each chunk of text as it arrives.
+ *
+ * @param {string} message - User's message
+ * @param {Function} onDelta - Called with each text chunk
+ * @returns {Promise<Object>} - Resolves with {tool_calls} when the reply is complete
+ */
+export async function streamChatMessage(message, onDelta) {
+  const response = await fetch(`${API_BASE}/chat/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ message }),
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to send message');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    const events = buffer.split('\n\n');
+    buffer = events.pop();
+
+    for (const event of events) {
+      if (!event.startsWith('data: ')) {
+        continue;
+      }
+      const data = JSON.parse(event.slice('data: '.length));
+      if (data.type === 'delta') {
+        onDelta(data.text);
+      } else if (data.type === 'done') {
+        return { tool_calls: data.tool_calls };
+      } else if (data.type === 'error') {
+        throw new Error(data.message);
+      }
+    }
+  }
+
+  throw new Error('Chat stream ended unexpectedly');
+}
+
 /**
  * Get all customers.
  *
@@ -1,5 +1,5 @@
 import React, { useState, useRef, useEffect } from 'react';
-import { sendChatMessage } from '../api';
+import { streamChatMessage } from '../api';
 import ChatMessage from '../components/ChatMessage';
 import './ChatPage.css';
 
@@ -43,34 +43,34 @@ export default function ChatPage() {
     setInput('');
     setError(null);
 
-    // Add user message to chat
-    setMessages(prev => [...prev, { role: 'user', content: userMessage }]);
+    // Add user message and an empty assistant message to fill as text streams in
+    setMessages(prev => [
+      ...prev,
+      { role: 'user', content: userMessage },
+      { role: 'assistant', content: '', toolCalls: [] }
+    ]);
     setIsLoading(true);
 
-    try {
-      // Send to backend
-      const response = await sendChatMessage(userMessage);
-
-      // Add assistant response to chat
+    // Replace the last (streaming) assistant message
+    const updateReply = (update) => {
       setMessages(prev => [
-        ...prev,
-        {
-          role: 'assistant',
-          content: response.response,
-          toolCalls: response.tool_calls || []
-        }
+        ...prev.slice(0, -1),
+        { ...prev[prev.length - 1], ...update(prev[prev.length - 1]) }
       ]);
+    };
+
+    try {
+      // Send to backend, appending text as it arrives
+      const response = await streamChatMessage(userMessage, (text) => {
+        updateReply(reply => ({ content: reply.content + text }));
+      });
+
+      // Attach the tools used once the reply is complete
+      updateReply(() => ({ toolCalls: response.tool_calls || [] }));
     } catch (err) {
       setError(err.message);
-      // Add error message to chat
-      setMessages(prev => [
-        ...prev,
-        {
-          role: 'assistant',
-          content: `Error: ${err.message}`,
-          toolCalls: []
-        }
-      ]);
+      // Show the error in place of the assistant response
+      updateReply(() => ({ content: `Error: ${err.message}`, toolCalls: [] }));
     } finally {
       setIsLoading(false);
     }